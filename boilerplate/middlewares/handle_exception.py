@@ -1,12 +1,12 @@
+import sys
 import traceback
-from uuid import uuid4
 
 from commons.utils.http_error import (HttpError, InternalServerError,
                                       MethodNotAllowed)
 from commons.utils.loggers import error_logger
+from commons.utils.request_id import generate_request_id
 from django.conf import settings
-from django.http.response import (HttpResponse, HttpResponseNotAllowed,
-                                  JsonResponse, StreamingHttpResponse)
+from django.http.response import HttpResponseBase, JsonResponse
 
 
 class HandleExceptionMiddleware:
@@ -36,10 +36,11 @@ class HandleExceptionMiddleware:
         try:
             response = self.get_response(request)
 
-            if isinstance(response, HttpResponseNotAllowed):
+            # views may return plain dicts which have no status code
+            if getattr(response, 'status_code', None) == 405:
                 raise MethodNotAllowed
 
-            if isinstance(response, (HttpResponse, StreamingHttpResponse)):
+            if isinstance(response, HttpResponseBase):
                 return response
             else:
                 return JsonResponse(response)
@@ -48,16 +49,18 @@ class HandleExceptionMiddleware:
             return e.response
 
         except Exception as e:
-            request_id = str(uuid4())
-            setattr(request, 'request_id', request_id)
-            # log unhandled exception
+            if not getattr(request, 'request_id', None):
+                setattr(request, 'request_id', generate_request_id())
+
+            # log unhandled exception, traceback is formatted once for both log file and stderr
             error = traceback.format_exc()
             log = '{uuid} :: \n{traceback}\n\n---------------------------------------------------------'.format(
                 uuid=request.request_id,
                 traceback=error
             )
             error_logger.error(log)
-            traceback.print_exc()
+            sys.stderr.write(error)
+            sys.stderr.flush()
 
             # send default error response hiding sensitive exception details
-            return InternalServerError().response
+            return InternalServerError.default_response()
@@ -22,6 +22,34 @@ class Params(EmbeddedMongoModel):
         final = True
 
 
+class RequestValidationConfigManager(DefaultManager):
+
+    def load_all_active(self):
+        """Lists all active request validation configs.
+
+        Loads every config having isActive set in a single query, so configs can be looked up in memory.
+        Documents are read as plain dictionaries straight from PyMongo, skipping PyMODM's queryset layer,
+        so ones missing routeName or method are skipped. Out of configs sharing routeName and method the
+        first one found is kept.
+
+        Returns:
+            A dictionary of config dictionaries keyed by (routeName, method).
+        """
+
+        configs = {}
+
+        for config in self.model._mongometa.collection.find({'isActive': True}):
+            route_name = config.get('routeName')
+            method = config.get('method')
+
+            if route_name is None or method is None:
+                continue
+
+            configs.setdefault((route_name, method), config)
+
+        return configs
+
+
 class RequestValidationConfig(MongoModel):
     '''Mongo model for request validation config.
     '''
@@ -32,7 +60,7 @@ class RequestValidationConfig(MongoModel):
     queryParams = fields.EmbeddedDocumentListField(Params, blank=True)
     urlParams = fields.EmbeddedDocumentListField(Params, blank=True)
     requestBodySchema = fields.DictField(blank=True)
-    objects = DefaultManager()
+    objects = RequestValidationConfigManager()
 
     class Meta:
         collection_name = "RequestValidationConfig"
@@ -1,15 +1,72 @@
-import json
 import re
+import time
 from datetime import datetime
+from functools import lru_cache, partial
+from json import loads as _loads
 
 from jsonschema import Draft4Validator
 
-from bson.objectid import ObjectId
+from bson.objectid import InvalidId, ObjectId
 from commons.utils.http_error import BadRequest
-from django.urls import resolve
+from commons.utils.url_resolver import resolve_path
+from django.conf import settings
+from django.dispatch import Signal, receiver
 
 from .helpers import RequestValidationConfig
 
+try:
+    # orjson parses request body bytes directly. Unlike json it turns integers wider than 64 bits
+    # into floats, so those fail an integer schema, and it rejects NaN, Infinity and lone surrogate
+    # escapes, which _json_loads hands over to json instead.
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # C parser for ISO 8601 dates, much faster than strptime
+    from ciso8601 import parse_datetime_as_naive
+except ImportError:
+    parse_datetime_as_naive = None
+
+# seconds for which loaded request validation configs are served from memory
+CONFIG_TTL_SECONDS = getattr(settings, 'REQUEST_VALIDATION_CONFIG_TTL', 60)
+
+# maximum number of compiled json schema validators kept in memory
+VALIDATOR_CACHE_SIZE = 512
+
+# maximum number of compiled param validation plans kept in memory
+PLAN_CACHE_SIZE = 512
+
+# sent by anything updating RequestValidationConfig documents to drop cached configs
+config_changed = Signal()
+
+# values accepted for INTEGER params, negative numbers included
+_INTEGER_RE = re.compile(r"-?[0-9]+")
+
+# values accepted for FLOAT params, whole numbers included
+_FLOAT_RE = re.compile(r"^\d+(?:\.\d+)?$")
+
+# date formats ciso8601 parses exactly like strptime, for values matching their shape
+_ISO_DATE_FORMATS = {}
+
+if parse_datetime_as_naive is not None:
+    _ISO_DATE_FORMATS = {
+        '%Y-%m-%d': re.compile(r"^[0-9]{4}-[0-9]{2}-[0-9]{2}$"),
+        # ciso8601 reads hour 24 as midnight of next day, strptime rejects it
+        '%Y-%m-%dT%H:%M:%S': re.compile(
+            r"^[0-9]{4}-[0-9]{2}-[0-9]{2}T(?:[01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]$"
+        )
+    }
+
+# (loaded_at, configs) of all active request validation configs, None until first request
+_active_configs = None
+
+# compiled json schema validators keyed by id of their schema, stored as (schema, validator)
+_VALIDATOR_CACHE = {}
+
+# compiled param validation plans keyed by id of their param schema, stored as (param_schema, plan)
+_PLAN_CACHE = {}
+
 
 class RequestValidationMiddleware:
     '''Middleware for validating incoming request url param, query params, body according to request validation config.
@@ -34,11 +91,11 @@ class RequestValidationMiddleware:
             BadRequest: If request validation fails.
 
         '''
-        request_parameters = resolve(request.path_info)
+        request_parameters = resolve_path(request.path_info)
         request_info = {
             'route_name': request_parameters.url_name,
-            'url_parameters': request_parameters.kwargs,
-            'query_parameters': dict(request.GET),
+            'url_parameters': dict(request_parameters.kwargs),
+            'query_parameters': {key: values[0] for key, values in request.GET.lists()},
             'request_body': request.body if request.body else {},
             'method': request.method
         }
@@ -50,287 +107,385 @@ class RequestValidationMiddleware:
         return response
 
 
-class ValidateParamType(object):
-    '''Validate data type of a param given it's config.
+def _json_loads(data):
+    '''Parse request body bytes, with json taking over whatever orjson refuses.
+    '''
 
-    Attributes:
-        __document: dictionary containing config to validate a param
-        __value: value of the param
-        __validation_types: dictionary containing validator method for each type
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+
+    return _loads(data.decode('utf-8'))
+
+
+@lru_cache(maxsize=1024)
+def _compile(pattern):
+    '''Compile a regex from param config once and reuse it for later requests.
     '''
 
-    def __init__(self, document, value):
-        self.__document = document
-        self.__value = value
-        self.__validation_types = {
-            'STRING': self.__validate_string_params,
-            'INTEGER': self.__validate_integer_params,
-            'OBJECT_ID': self.__validate_object_id_params,
-            'FLOAT': self.__validate_float_params,
-            'DATE': self.__validate_date_params
-        }
+    return re.compile(pattern)
 
-    def validate(self):
-        '''This method is used to validate param for string, integer, object_id or float data type.
 
-        Returns:
-            List of errors
+def _validate_integer(name, constrain, value):
+    '''Validate param for integer data type.
 
-            Example:
-                [
-                    {
-                        "message": "id must be of interger type"
-                    }
-                ]
-        '''
+    Returns:
+        List of errors
 
-        if not self.__validation_types.get(self.__document.get('dataType')):
-            return [{
-                "message": self.__document.get('name') + " has unknown data type: " + self.__document.get('dataType')
-            }]
+        Example:
+            [
+                {
+                    "message": "id must be of interger type"
+                }
+            ]
+    '''
 
-        return self.__validation_types.get(self.__document.get('dataType'))()
+    if _INTEGER_RE.fullmatch(str(value)) is None:
+        return [{
+            "message": name + " must be of integer type"
+        }]
 
-    def __validate_integer_params(self):
-        '''This method is used to validate param for integer data type.
+    if constrain is not None:
+        return constrain(int(value))
 
-        Returns:
-            List of errors
+    return []
 
-            Example:
-                [
-                    {
-                        "message": "id must be of interger type"
-                    }
-                ]
-        '''
 
-        errors = []
+def _validate_float(name, constrain, value):
+    '''Validate param for float data type.
 
-        if str(self.__value).isdigit():
+    Returns:
+        List of errors
 
-            if self.__document.get('action'):
-                action_errors = self.__validate_param_constraint(
-                    self.__document, int(self.__value)
-                )
+        Example:
+            [
+                {
+                    "message": "id must be of float type"
+                }
+            ]
+    '''
 
-                if action_errors:
-                    errors += action_errors
+    if _FLOAT_RE.match(str(value)) is None:
+        return [{
+            "message": name + " must be of float type"
+        }]
 
-        else:
-            errors.append({
-                "message": self.__document.get('name') + " must be of integer type"
-            })
+    if constrain is not None:
+        return constrain(float(value))
 
-        return errors
+    return []
 
-    def __validate_float_params(self):
-        '''This method is used to validate param for float data type.
 
-        Returns:
-            List of errors
+def _validate_object_id(name, constrain, value):
+    '''Validate wether the param value is a valid ObjectId.
 
-            Example:
-                [
-                    {
-                        "message": "id must be of float type"
-                    }
-                ]
-        '''
+    Returns:
+        List of errors
 
-        errors = []
+        Example:
+            [
+                {
+                    "message": "id must be of type ObjectId"
+                }
+            ]
+    '''
 
-        if re.match("^\d+?\.\d+?$", str(self.__value)) is None:
-            error_obj = {
-                "message": self.__document.get('name') + " must be of float type"
-            }
-            errors.append(error_obj)
+    try:
+        ObjectId(value)
 
-        else:
+    except (InvalidId, TypeError):
+        return [{
+            "message": name + " must be of type ObjectId"
+        }]
 
-            if self.__document.get('action'):
-                action_errors = self.__validate_param_constraint(self.__document, float(self.__value))
+    if constrain is not None:
+        return constrain(value)
 
-                if action_errors:
-                    errors += action_errors
+    return []
 
-        return errors
 
-    def __validate_object_id_params(self):
-        '''This method is used to validate wether the param value is a valid ObjectId.
+def _validate_string(name, constrain, value, regex=None):
+    '''Validate wether the param value is a valid string.
 
-        Returns:
-            List of errors
+    Returns:
+        List of errors
 
-            Example:
-                [
-                    {
-                        "message": "id must be of type ObjectId"
-                    }
-                ]
-        '''
+        Example:
+            [
+                {
+                    "message": "id must follow regex",
+                    "regex": "^\d+?\.\d+?$"
+                }
+            ]
+    '''
+
+    if not isinstance(value, str):
+        return [{
+            "message": name + " must be of string type"
+        }]
+
+    if regex is not None and regex.match(value) is None:
+        return [{
+            "message": name + " must follow regex " + regex.pattern
+        }]
 
-        errors = []
+    if constrain is not None:
+        return constrain(value)
 
-        if ObjectId.is_valid(str(self.__value)):
+    return []
 
-            if self.__document.get('action'):
-                action_errors = self.__validate_param_constraint(self.__document, self.__value)
 
-                if action_errors:
-                    errors += action_errors
+def _validate_date(name, constrain, value, date_format=None, iso_re=None):
+    '''Validate wether the param value is a valid date.
+
+    Returns:
+        List of errors
+
+        Example:
+            [
+                {
+                    "message": "from must be of date type with format %Y-%m-%d"
+                }
+            ]
+    '''
+
+    value = str(value)
 
+    try:
+        if iso_re is not None and iso_re.match(value) is not None:
+            date = parse_datetime_as_naive(value)
         else:
-            error_obj = {
-                "message": self.__document.get('name') + " must be of type ObjectId"
-            }
-            errors.append(error_obj)
+            date = datetime.strptime(value, str(date_format))
 
-        return errors
+    except ValueError:
+        return [{
+            "message": name + " must be of date type with format " + date_format
+        }]
 
-    def __validate_string_params(self):
-        '''This method is used to validate wether the param value is a valid string.
+    if constrain is not None:
+        return constrain(date)
 
-        Returns:
-            List of errors
+    return []
 
-            Example:
-                [
-                    {
-                        "message": "id must follow regex",
-                        "regex": "^\d+?\.\d+?$"
-                    }
-                ]
-        '''
 
-        errors = []
+def _validate_unknown(name, data_type, value):
+    '''Fallback for params configured with a data type having no validator.
+    '''
 
-        if isinstance(self.__value, str):
+    return [{
+        "message": name + " has unknown data type: " + data_type
+    }]
 
-            if self.__document.get('regex') and re.match(self.__document.get('regex'), self.__value) is None:
-                error_obj = {
-                    "message": self.__document.get('name') + " must follow regex " + self.__document.get('regex')
-                }
-                errors.append(error_obj)
 
-            else:
+def _check_between(name, value, expected):
+    low = expected.get('min')
+    high = expected.get('max')
 
-                if self.__document.get('action'):
-                    action_errors = self.__validate_param_constraint(self.__document, self.__value)
+    if low <= value <= high:
+        return []
 
-                    if action_errors:
-                        errors += action_errors
-        else:
-            errors.append({
-                "message": self.__document.get('name') + " must be of string type"
-            })
+    return [{
+        "message": name + " out of range",
+        "expectedRange": {
+            "min": str(low),
+            "max": str(high)
+        }
+    }]
 
-        return errors
 
-    def __validate_date_params(self):
-        '''This method is used to validate wether the param value is a valid date.
+def _check_equals(name, value, expected):
+    if value == expected:
+        return []
 
-        Returns:
-            List of errors
+    return [{
+        "message": name + " incorrect value",
+        "expectedValue": expected
+    }]
 
-            Example:
-                [
-                    {
-                        "message": "from must be of date type with format %Y-%m-%d"
-                    }
-                ]
-        '''
 
-        errors = []
+def _check_in(name, value, expected):
+    if value in expected:
+        return []
 
-        try:
-            date = datetime.strptime(str(self.__value), str(self.__document.get('format')))
+    return [{
+        "message": name + " incorrect value",
+        "expectedValues": expected
+    }]
 
-        except ValueError:
-            errors.append({
-                "message": (self.__document.get('name') + " must be of date type with format " +
-                            self.__document.get('format'))
-            })
 
-            return errors
+def _check_greater_than(name, value, expected):
+    if value > expected:
+        return []
 
-        if self.__document.get('action'):
-            action_errors = self.__validate_param_constraint(self.__document, date)
+    return [{
+        "message": name + " should be greater than " + str(expected)
+    }]
 
-            if action_errors:
-                errors += action_errors
 
-        return errors
+def _check_less_than(name, value, expected):
+    if value < expected:
+        return []
 
-    def __validate_param_constraint(self, param_info, param_value):
-        '''This method is used to check various types of constraints on param.
+    return [{
+        "message": name + " should be less than " + str(expected)
+    }]
 
-        Args:
-            param_info (Object): Contains query or url param info
-            param_value: Value of the param obtained from request.
 
-        Returns:
-            List of errors against each type of query param
-
-            Example:
-                [
-                    {
-                        "message": "strategyId out of range",
-                        "expectedRange": {
-                            "min": 100,
-                            "max": 200
-                        }
-                    },
-                    {
-                        "message": "id incorrect value",
-                        "expectedValue": 12
-                    }
-                ]
-        '''
+# validator of each param data type, called with (name, constrain, value, **options)
+_VALIDATORS = {
+    'STRING': _validate_string,
+    'INTEGER': _validate_integer,
+    'OBJECT_ID': _validate_object_id,
+    'FLOAT': _validate_float,
+    'DATE': _validate_date
+}
+
+# checker of each param action type, called with (name, value, expected)
+_CONSTRAINTS = {
+    'BETWEEN': _check_between,
+    'EQUALS': _check_equals,
+    'IN': _check_in,
+    'GREATER_THAN': _check_greater_than,
+    'LESS_THAN': _check_less_than
+}
 
-        error = []
-        action_type = self.__document['action'].get('actionType')
-        values = self.__document['action'].get('value')
 
-        if action_type == 'BETWEEN':
+def _bind_constraint(param_info):
+    '''Resolve the action configured on a param into a checker of its value.
 
-            if not(param_value >= values.get('min') and param_value <= values.get('max')):
-                error.append({
-                    "message": param_info.get('name') + " out of range",
+    Args:
+        param_info (Object): Contains query or url param info
+
+    Returns:
+        Callable taking the param value converted to its data type and returning list of errors,
+        or None if param has no known action.
+
+        Example of returned errors:
+            [
+                {
+                    "message": "strategyId out of range",
                     "expectedRange": {
-                        "min": str(values.get('min')),
-                        "max": str(values.get('max'))
+                        "min": 100,
+                        "max": 200
                     }
-                })
+                },
+                {
+                    "message": "id incorrect value",
+                    "expectedValue": 12
+                }
+            ]
+    '''
+
+    action = param_info.get('action')
+
+    if not action:
+        return None
+
+    check = _CONSTRAINTS.get(action.get('actionType'))
+
+    if check is None:
+        return None
+
+    return partial(check, param_info.get('name'), expected=action.get('value'))
+
+
+def _bind_validator(document):
+    '''Resolve data type, regex, date format and action of a param config into a single validator.
+
+    Args:
+        document: dictionary containing config to validate a param
+
+    Returns:
+        Callable taking the param value and returning list of errors.
+    '''
+
+    name = document.get('name')
+    data_type = document.get('dataType')
+    validator = _VALIDATORS.get(data_type)
+
+    if validator is None:
+        return partial(_validate_unknown, name, data_type)
+
+    options = {}
+
+    if data_type == 'STRING' and document.get('regex'):
+        options['regex'] = _compile(document.get('regex'))
+
+    elif data_type == 'DATE':
+        options['date_format'] = document.get('format')
+        options['iso_re'] = _ISO_DATE_FORMATS.get(document.get('format'))
+
+    return partial(validator, name, _bind_constraint(document), **options)
+
+
+def validate_param(document, value):
+    '''Validate a param value for string, integer, object_id, float or date data type.
+
+    Args:
+        document: dictionary containing config to validate a param
+        value: value of the param
+
+    Returns:
+        List of errors
+
+        Example:
+            [
+                {
+                    "message": "id must be of interger type"
+                }
+            ]
+    '''
+
+    return _bind_validator(document)(value)
+
+
+def _get_cached(cache, max_size, key, build):
+    '''Get what build makes out of key, building it only on first use.
+
+    Args:
+        cache: dictionary holding (key, built) entries keyed by id of key.
+        max_size: number of entries after which cache is emptied.
+        key: config object, such as a schema, the built value depends on.
+        build: callable taking key and returning the value to cache.
+
+    Returns:
+        Value built for key.
+    '''
+
+    cached = cache.get(id(key))
+
+    # key is kept referenced by the entry, identity check guards against a reused id
+    if cached is None or cached[0] is not key:
+        if len(cache) >= max_size:
+            cache.clear()
+
+        cached = (key, build(key))
+        cache[id(key)] = cached
+
+    return cached[1]
+
 
-        elif action_type == 'EQUALS':
+def _build_plan(param_schema):
+    return [
+        (doc['name'], doc.get('isRequired', False), doc['dataType'], _bind_validator(doc))
+        for doc in param_schema
+    ]
 
-            if param_value != values:
-                error.append({
-                    "message": param_info.get('name') + " incorrect value",
-                    "expectedValue": values
-                })
 
-        elif action_type == 'IN':
+def _get_plan(param_schema):
+    '''Get validation plan of a param schema, building it only on first use.
 
-            if param_value not in values:
-                error.append({
-                    "message": param_info.get('name') + " incorrect value",
-                    "expectedValues": values
-                })
+    Args:
+        param_schema: list of dictionaries containing param configs.
 
-        elif action_type == 'GREATER_THAN':
-            if param_value <= values:
-                error.append({
-                    "message": param_info.get('name') + " should be greater than" + values,
-                })
-        elif action_type == 'LESS_THAN':
-            if param_value >= values:
-                error.append({
-                    "message": param_info.get('name') + " should be less than" + values,
-                })
+    Returns:
+        List of (name, is_required, data_type, validate) tuples, one per param config,
+        where validate takes the param value and returns list of errors.
+    '''
 
-        return error
+    return _get_cached(_PLAN_CACHE, PLAN_CACHE_SIZE, param_schema, _build_plan)
 
 
 def validate_params(param_schema, request_info, param_type):
@@ -343,24 +498,25 @@ def validate_params(param_schema, request_info, param_type):
     '''
 
     response = []
+    params = {}
 
-    for doc in param_schema:
-        value = None
+    if param_type == "urlParams":
+        params = request_info['url_parameters']
 
-        if param_type == "urlParams":
-            value = request_info['url_parameters'].get(str(doc.get('name')))
+    elif param_type == "queryParams":
+        params = request_info['query_parameters']
 
-        elif param_type == "queryParams":
-            value = request_info['query_parameters'].get(str(doc.get('name')), [''])[0]
+    for name, is_required, data_type, validate in _get_plan(param_schema):
+        value = params.get(name)
 
-        if not value and doc.get('isRequired'):
+        if not value and is_required:
             response.append({
-                "message": doc.get('name') + " param is manadatory",
-                "type": doc.get('dataType')
+                "message": name + " param is manadatory",
+                "type": data_type
             })
 
         if value:
-            validation_status = ValidateParamType(doc, value).validate()
+            validation_status = validate(value)
 
             if validation_status:
                 response += validation_status
@@ -368,12 +524,35 @@ def validate_params(param_schema, request_info, param_type):
     return response if response else None
 
 
-def validate_json_body(body, schema):
+def _build_json_validator(schema):
+    Draft4Validator.check_schema(schema)
+
+    return Draft4Validator(schema)
+
+
+def _get_json_validator(schema):
+    '''Get a compiled validator for a request body schema, compiling it only on first use.
+
+    Args:
+        schema: JSON like dictionary schema for request body
+
+    Returns:
+        Draft4Validator instance for the schema.
+
+    Raises:
+        SchemaError: If schema itself is not a valid JSON schema.
+    '''
+
+    return _get_cached(_VALIDATOR_CACHE, VALIDATOR_CACHE_SIZE, schema, _build_json_validator)
+
+
+def validate_json_body(body, schema, early_exit=False):
     '''This method is used to validate request body against defined schema.
 
     Args:
         body: JSON like dictionary request body
         schema: JSON like dictionary schema for sent request body
+        early_exit: If set to True validation stops at the first error found
 
     Returns:
         List of errors against each key in json request body
@@ -388,14 +567,64 @@ def validate_json_body(body, schema):
     '''
 
     errors = []
-    validator = Draft4Validator(schema)
+    validator = _get_json_validator(schema)
+
+    # errors are generated lazily, so stopping at the first one skips validating the rest of body
+    if early_exit:
+        error = next(validator.iter_errors(body), None)
+        return [error.message] if error is not None else None
 
-    for error in sorted(validator.iter_errors(body)):
+    for error in validator.iter_errors(body):
         errors.append(error.message)
 
     return errors if errors else None
 
 
+def _get_active_configs():
+    '''Get all active request validation configs, reloaded from database every CONFIG_TTL_SECONDS.
+
+    Returns:
+        Dictionary of config dictionaries keyed by (routeName, method).
+    '''
+
+    global _active_configs
+
+    loaded = _active_configs
+    now = time.monotonic()
+
+    if loaded is None or now - loaded[0] >= CONFIG_TTL_SECONDS:
+        loaded = (now, RequestValidationConfig.objects.load_all_active())
+        _active_configs = loaded
+
+    return loaded[1]
+
+
+def _get_config(route_name, method):
+    '''Get active request validation config of a route.
+
+    Args:
+        route_name: name of the resolved url route.
+        method: HTTP method of the request.
+
+    Returns:
+        Config dictionary or None if route has no active config.
+    '''
+
+    return _get_active_configs().get((route_name, method))
+
+
+@receiver(config_changed)
+def clear_config_cache(**kwargs):
+    '''Drop all cached request validation configs, they get reloaded on next request.
+    '''
+
+    global _active_configs
+
+    _active_configs = None
+    _VALIDATOR_CACHE.clear()
+    _PLAN_CACHE.clear()
+
+
 def request_validator(request_info):
 
     '''This method is used to validate all incoming requests before the request goes to handlers.
@@ -427,13 +656,7 @@ def request_validator(request_info):
 
     '''
 
-    config_query = {
-        'routeName': request_info['route_name'],
-        'isActive': True,
-        'method': request_info['method']
-    }
-
-    request_config = RequestValidationConfig.objects.get_one(queries=config_query)
+    request_config = _get_config(request_info['route_name'], request_info['method'])
 
     if request_config:
         response = {}
@@ -455,7 +678,7 @@ def request_validator(request_info):
             request_body_status = None
 
             try:
-                data = json.loads(request_info['request_body'].decode('utf-8'))
+                data = _json_loads(request_info['request_body'])
             except Exception:
                 request_body_status = [{"message": "Invalid request body."}]
 
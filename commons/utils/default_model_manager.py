@@ -5,7 +5,7 @@ from pymongo.collection import ReturnDocument
 
 class DefaultManager(Manager):
 
-    def get_all(self, filters=None, queries=None, projection=None, limit=None, offset=None, sort=None):
+    def get_all(self, filters=None, queries=None, projection=None, limit=None, offset=None, sort=None, stream=False):
         """Lists all model documents matching method args
 
         Queries on a specific collection and gets documents according to method args.
@@ -17,9 +17,10 @@ class DefaultManager(Manager):
             limit: integer limit for pagination.
             offset: integer offset for pagination.
             sort: a list of dictionary which specifies the parameters and order to sort the result data.
+            stream: If set to True documents are yielded from the cursor instead of being loaded in a list.
 
         Returns:
-            A list of model dictionaries matching the query.
+            A list of model dictionaries matching the query, or an iterator over them if stream is True.
         """
         query = {}
         if queries:
@@ -41,6 +42,10 @@ class DefaultManager(Manager):
 
         if limit:
             resources = resources.limit(limit)
+
+        if stream:
+            return iter(resources.values())
+
         return list(resources.values())
 
     def get_by_id(self, _id, projection=None):
@@ -99,6 +104,27 @@ class DefaultManager(Manager):
 
         return result
 
+    def get_one_raw(self, queries=None, projection=None):
+        """Lists a single raw document matching the queries.
+
+        Reads straight from the underlying PyMongo collection, skipping PyMODM's queryset layer.
+        Meant for read-only lookups which only need plain dictionaries.
+
+        Args:
+            queries: dictionary of parameters to find the required document.
+            projection: dict of projection required.
+
+        Returns:
+            A single document dictionary matching the queries, None if no document matches.
+        """
+
+        meta = self.model._mongometa
+
+        # raw_query adds the _cls filter PyMODM applies to non-final models
+        query = self.model.objects.raw(queries or {}).raw_query
+
+        return meta.collection.find_one(query, projection, collation=meta.collation)
+
     def insert_one(self, data):
         """Inserts a single model document matching id.
 
@@ -147,12 +173,9 @@ class DefaultManager(Manager):
 
         Returns:
             The document after it is updated or before it is updated according to the value of return_document passed.
+            If return_document is not given, the count of modified documents (0 or 1).
         """
         query = {}
-        return_document_query = {}
-        id_doc = None
-        response = None
-        return_document_response = None
 
         if queries:
             query = queries
@@ -162,56 +185,23 @@ class DefaultManager(Manager):
                 "$and": filters
             }
 
-        try:
-            id_doc = self.model.objects.raw(query).first()._qs.raw_query
-            return_document_query = dict(id_doc)
-        except Exception:
-            id_doc = None
-            return_document_query = dict(query)
-
-        if id_doc:
-            query_list = []
-            query_list.append(id_doc)
-            if '$and' not in list(query):
-                for key, value in iter(query.items()):
-                    key_value_dict = {key: value}
-                    query_list.append(key_value_dict)
-
-                query = {}
-                query.setdefault('$and', []).extend(query_list)
-        elif return_document is None and not upsert:
-            return 0
-        elif return_document is not None and not upsert:
-            return None
+        meta = self.model._mongometa
 
-        queryset = self.model.objects.raw(query)
-        return_doc_queryset = self.model.objects.raw(return_document_query)
+        # raw_query adds the _cls filter PyMODM applies to non-final models
+        query = self.model.objects.raw(query).raw_query
 
-        if return_document == ReturnDocument.BEFORE:
-            try:
-                return_document_response = return_doc_queryset
-                if projection:
-                    return_document_response = return_document_response.project(projection)
-                return_document_response = return_document_response.values().first()
-            except Exception:
-                return_document_response = None
+        # as PyMODM's QuerySet.update, stamp _cls on upserted documents of non-final models
+        if upsert and not meta.final:
+            data = dict(data)
+            data['$set'] = dict(data.get('$set', {}), _cls=meta.object_name)
 
-        update_response = queryset.update(data, upsert=upsert)
-
-        if return_document == ReturnDocument.AFTER:
-            try:
-                return_document_response = return_doc_queryset
-                if projection:
-                    return_document_response = return_document_response.project(projection)
-                return_document_response = return_document_response.values().first()
-            except Exception:
-                return_document_response = None
+        if return_document is None:
+            return meta.collection.update_one(query, data, upsert=upsert, collation=meta.collation).modified_count
 
-        if return_document is not None:
-            response = return_document_response
-        else:
-            response = update_response
-        return response
+        return meta.collection.find_one_and_update(
+            query, data, projection=projection, upsert=upsert, return_document=return_document,
+            collation=meta.collation
+        )
 
     def update_by_id(self, _id, data, projection=None, upsert=False, return_document=None):
         """Updates a single document matching query criteria.
@@ -1,30 +1,96 @@
-from django.http import JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.functional import cached_property
+
+from json import dumps as _dumps
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _stdlib_json_dumps(data):
+    return _dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
+
+
+def _json_dumps(data):
+    '''Serialize response body to JSON bytes, with orjson when it is installed.
+    '''
+    if orjson is None:
+        return _stdlib_json_dumps(data)
+
+    try:
+        # datetimes and types orjson can't serialize natively are handled like Django's JsonResponse does
+        return orjson.dumps(
+            data, default=DjangoJSONEncoder().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+    except orjson.JSONEncodeError:
+        # e.g. integers beyond 64 bits
+        return _stdlib_json_dumps(data)
 
 
 class HttpError(Exception):
     '''Http Error Exception to be extended for various Http error status codes
 
+    Subclasses only set status_code and default_message class attributes.
+
     Attributes:
+        message: error message to be sent in response
+        error_code: application specific error code (optional) to be sent in response
         errors: errors dictionary (optional) revealing more details to be sent in response
         response: response body to be sent
     '''
-    def __init__(self, status_code, message="", error_code=None, errors={}):
+
+    status_code = 500
+    default_message = ""
+
+    def __init__(self, message=None, error_code=None, errors=None):
+        self.message = self.default_message if message is None else message
+        self.error_code = error_code
+        self.errors = errors
+
+        super(HttpError, self).__init__(self, self.message)
+
+    @cached_property
+    def response(self):
+        '''Response to be sent, built and serialized only when first accessed.
+        '''
         response = {
-          "statusCode": status_code,
+          "statusCode": self.status_code,
           "error": {
-            "message": message
+            "message": self.message
           }
         }
-        if error_code is not None:
-            response['error']['code'] = error_code
+        if self.error_code is not None:
+            response['error']['code'] = self.error_code
+
+        if self.errors is not None:
+            response['error']['errors'] = self.errors
 
-        if errors is not None:
-            response['error']['errors'] = errors
+        return HttpResponse(_json_dumps(response), status=self.status_code, content_type='application/json')
 
-        setattr(self, 'errors', errors)
-        setattr(self, 'response', JsonResponse(response, status=status_code))
+    @classmethod
+    def default_response_bytes(cls):
+        '''Serialized response body of the error raised with default arguments, built once per subclass.
 
-        super(HttpError, self).__init__(self, message)
+        Returns:
+            JSON bytes of the default response.
+        '''
+        if '_default_json' not in cls.__dict__:
+            cls._default_json = cls().response.content
+
+        return cls._default_json
+
+    @classmethod
+    def default_response(cls):
+        '''Response of the error raised with default arguments, without serializing its body again.
+
+        Returns:
+            Django's HttpResponse instance.
+        '''
+        return HttpResponse(cls.default_response_bytes(), status=cls.status_code, content_type='application/json')
 
 
 class BadRequest(HttpError):
@@ -34,9 +100,7 @@ class BadRequest(HttpError):
     '''
 
     status_code = 400
-
-    def __init__(self, message="The request is invalid. Please try again.", error_code=None, errors=None):
-        super(BadRequest, self).__init__(self.status_code, message, error_code, errors)
+    default_message = "The request is invalid. Please try again."
 
 
 class Unauthorized(HttpError):
@@ -47,9 +111,7 @@ class Unauthorized(HttpError):
     '''
 
     status_code = 401
-
-    def __init__(self, message="Sent request is unauthorized. Please log in first.", error_code=None, errors=None):
-        super(Unauthorized, self).__init__(self.status_code, message, error_code, errors)
+    default_message = "Sent request is unauthorized. Please log in first."
 
 
 class PaymentRequired(HttpError):
@@ -59,12 +121,7 @@ class PaymentRequired(HttpError):
     '''
 
     status_code = 402
-
-    def __init__(
-        self, message="Please confirm your purchase first. Payment is required to access this resource",
-        error_code=None, errors=None
-    ):
-        super(PaymentRequired, self).__init__(self.status_code, message, error_code, errors)
+    default_message = "Please confirm your purchase first. Payment is required to access this resource"
 
 
 class Forbidden(HttpError):
@@ -74,9 +131,7 @@ class Forbidden(HttpError):
     '''
 
     status_code = 403
-
-    def __init__(self, message="You don't have necessary permissions to access this resource.", error_code=None, errors=None):
-        super(Forbidden, self).__init__(self.status_code, message, error_code, errors)
+    default_message = "You don't have necessary permissions to access this resource."
 
 
 class NotFound(HttpError):
@@ -86,9 +141,7 @@ class NotFound(HttpError):
     '''
 
     status_code = 404
-
-    def __init__(self, message="The resource you are looking for does not exist.", error_code=None, errors=None):
-        super(NotFound, self).__init__(self.status_code, message, error_code, errors)
+    default_message = "The resource you are looking for does not exist."
 
 
 class MethodNotAllowed(HttpError):
@@ -98,9 +151,7 @@ class MethodNotAllowed(HttpError):
     '''
 
     status_code = 405
-
-    def __init__(self, message="This method is not allowed for the sent request.", error_code=None, errors=None):
-        super(MethodNotAllowed, self).__init__(self.status_code, message, error_code, errors)
+    default_message = "This method is not allowed for the sent request."
 
 
 class Conflict(HttpError):
@@ -110,9 +161,7 @@ class Conflict(HttpError):
     '''
 
     status_code = 409
-
-    def __init__(self, message="The request seems to be conflicting.", error_code=None, errors=None):
-        super(Conflict, self).__init__(self.status_code, message, error_code, errors)
+    default_message = "The request seems to be conflicting."
 
 
 class UnsupportedMediaType(HttpError):
@@ -123,9 +172,7 @@ class UnsupportedMediaType(HttpError):
     '''
 
     status_code = 415
-
-    def __init__(self, message="The sent filetype(s) not supported.", error_code=None, errors=None):
-        super(UnsupportedMediaType, self).__init__(self.status_code, message, error_code, errors)
+    default_message = "The sent filetype(s) not supported."
 
 
 class Locked(HttpError):
@@ -135,9 +182,7 @@ class Locked(HttpError):
     '''
 
     status_code = 423
-
-    def __init__(self, message="This resource is currently locked! Please try again later.", error_code=None, errors=None):
-        super(Locked, self).__init__(self.status_code, message, error_code, errors)
+    default_message = "This resource is currently locked! Please try again later."
 
 
 class InternalServerError(HttpError):
@@ -148,12 +193,7 @@ class InternalServerError(HttpError):
     '''
 
     status_code = 500
-
-    def __init__(
-        self, message="Looks like something went wrong! Please try again.\nIf the issue persists please contact support.",
-        error_code=None, errors=None
-    ):
-        super(InternalServerError, self).__init__(self.status_code, message, error_code, errors)
+    default_message = "Looks like something went wrong! Please try again.\nIf the issue persists please contact support."
 
 
 class NotImplemented(HttpError):
@@ -164,6 +204,4 @@ class NotImplemented(HttpError):
     '''
 
     status_code = 501
-
-    def __init__(self, message="This action for sent request is yet to be implemented.", error_code=None, errors=None):
-        super(NotImplemented, self).__init__(self.status_code, message, error_code, errors)
+    default_message = "This action for sent request is yet to be implemented."
@@ -1 +1,2 @@
 from .error_logger import error_logger
+from .request_logger import log_transaction, request_logger
@@ -1,12 +1,208 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 
 from django.conf import settings
 
+# bytes of log output buffered in memory before a write to the log file
+LOG_BUFFER_SIZE = 65536
+
+# records collected before they are handed to the file handler in one batch
+LOG_BATCH_CAPACITY = 512
+
+# seconds between flushes of batched records, bounds what is lost on a crash
+LOG_FLUSH_INTERVAL = 1
+
+# directory log files are written to, created on import if it doesn't exist
+_LOG_DIR = os.path.join(settings.BASE_DIR, 'log')
+os.makedirs(_LOG_DIR, exist_ok=True)
+
+# loggers already built by get_logger, keyed by logger name
+_LOGGER_CACHE = {}
+_LOCK = threading.Lock()
+
+# (queue_handler, listener) of each logger, listener thread writes queued log records to file
+_LISTENERS = []
+
+# batching handlers flushed every LOG_FLUSH_INTERVAL seconds
+_BATCH_HANDLERS = []
+_flusher = None
+
+
+class BufferedTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
+    '''Time rotating file handler writing through a LOG_BUFFER_SIZE buffer.
+
+    Unlike StreamHandler it does not flush after every record, buffer is written out by
+    flush_buffer, on rollover and on close.
+    '''
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=LOG_BUFFER_SIZE, encoding=self.encoding)
+
+    def flush(self):
+        pass
+
+    def flush_buffer(self):
+        self.acquire()
+        try:
+            if self.stream:
+                self.stream.flush()
+        finally:
+            self.release()
+
+
+class BatchingHandler(logging.handlers.MemoryHandler):
+    '''Memory handler handing a whole batch of records to its buffered file handler
+    and writing them out with a single flush.
+    '''
+
+    def flush(self):
+        super(BatchingHandler, self).flush()
+
+        if self.target:
+            self.target.flush_buffer()
+
+
+class FastFormatter(logging.Formatter):
+    '''Formatter rendering asctime through strftime once per second instead of once per record.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super(FastFormatter, self).__init__(*args, **kwargs)
+        self._last_second = None
+        self._last_time = None
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super(FastFormatter, self).formatTime(record, datefmt)
+
+        second = int(record.created)
+
+        if second != self._last_second:
+            self._last_time = time.strftime(self.default_time_format, self.converter(second))
+            self._last_second = second
+
+        return self.default_msec_format % (self._last_time, record.msecs)
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(LOG_FLUSH_INTERVAL)
+
+        for handler in list(_BATCH_HANDLERS):
+            handler.flush()
+
+
+def _start_flusher():
+    global _flusher
+
+    _flusher = threading.Thread(target=_flush_periodically, name='log-flusher', daemon=True)
+    _flusher.start()
+
+
+def _flush_before_fork():
+    '''Write out batched records and hold handler locks while forking.
+
+    Otherwise the child inherits unwritten buffers and writes the parent's records a second time.
+    '''
+    for handler in _BATCH_HANDLERS:
+        handler.acquire()
+        handler.target.acquire()
+        handler.flush()
+
+
+def _release_after_fork_in_parent():
+    for handler in reversed(_BATCH_HANDLERS):
+        handler.target.release()
+        handler.release()
+
+
+def _start_listener(queue_handler, handler):
+    listener = logging.handlers.QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+    listener.start()
+
+    return listener
+
+
+def _restart_log_threads_in_child():
+    '''Give a forked child its own queues, listener threads and periodic flusher.
+
+    Child only inherits the thread calling fork, without this records would pile up in queues
+    nobody reads (e.g. uWSGI or gunicorn --preload workers). Records left in inherited queues
+    belong to the parent which writes them itself.
+    '''
+    global _LOCK
+
+    _LOCK = threading.Lock()
+
+    # locks were held by the parent's forking thread, child starts with fresh ones
+    for handler in _BATCH_HANDLERS:
+        handler.createLock()
+        handler.target.createLock()
+
+    if _BATCH_HANDLERS:
+        _start_flusher()
+
+    for index, (queue_handler, listener) in enumerate(_LISTENERS):
+        queue_handler.queue = queue.Queue(-1)
+        _LISTENERS[index] = (queue_handler, _start_listener(queue_handler, *listener.handlers))
+
+
+os.register_at_fork(
+    before=_flush_before_fork,
+    after_in_parent=_release_after_fork_in_parent,
+    after_in_child=_restart_log_threads_in_child
+)
+
+
+@atexit.register
+def _stop_listeners():
+    '''Flush records still queued and stop listener threads on interpreter exit.
+    '''
+    for queue_handler, listener in _LISTENERS:
+        listener.stop()
+
+    for handler in _BATCH_HANDLERS:
+        handler.flush()
+
 
 def get_logger(logger_name, log_level=logging.DEBUG):
     '''Method to get logger according to given name and log level.
 
+    Loggers are built once per name, later calls return the same instance.
+
+    Args:
+        logger_name: name of the logger.
+        log_level: level of the logger.
+
+    Returns:
+        python's Logger class instance.
+
+    '''
+    logger = _LOGGER_CACHE.get(logger_name)
+
+    if logger is None:
+        with _LOCK:
+            logger = _LOGGER_CACHE.get(logger_name)
+
+            if logger is None:
+                logger = _build_logger(logger_name, log_level)
+                _LOGGER_CACHE[logger_name] = logger
+
+    return logger
+
+
+def _build_logger(logger_name, log_level):
+    '''Method to create logger with a time rotating file handler.
+
+    Logger itself only enqueues records, the file handler is run by a QueueListener thread
+    so callers never block on disk writes. Records are written in batches, as soon as
+    LOG_BATCH_CAPACITY records are collected, an ERROR record arrives or LOG_FLUSH_INTERVAL passes.
+
     Args:
         logger_name: name of the logger.
         log_level: level of the logger.
@@ -18,8 +214,7 @@ def get_logger(logger_name, log_level=logging.DEBUG):
     # get process id
     pid = os.getpid()
 
-    log_dir_path = os.path.join(settings.BASE_DIR, 'log')
-    log_file_path = os.path.join(log_dir_path, logger_name + '.log')
+    log_file_path = os.path.join(_LOG_DIR, logger_name + '.log')
 
     log_format = (
         "PID: " + str(pid) + "> %(asctime)s - %(name)s - %(levelname)s - "
@@ -30,17 +225,29 @@ def get_logger(logger_name, log_level=logging.DEBUG):
     logger = logging.getLogger(logger_name)
     logger.setLevel(log_level)
 
-    # create log directory if it doesn't exist
-    if not os.path.exists(log_dir_path):
-        os.makedirs(log_dir_path)
+    # logger may already have a handler attached by another module
+    if logger.handlers:
+        return logger
 
     # Time Rotating File Handler to start new log file every midnight
-    timed_rotating_handler = logging.handlers.TimedRotatingFileHandler(
+    timed_rotating_handler = BufferedTimedRotatingFileHandler(
         log_file_path, when='midnight', interval=1
     )
 
-    log_formatter = logging.Formatter(log_format)
+    log_formatter = FastFormatter(log_format)
     timed_rotating_handler.setFormatter(log_formatter)
-    logger.addHandler(timed_rotating_handler)
+
+    batching_handler = BatchingHandler(
+        LOG_BATCH_CAPACITY, flushLevel=logging.ERROR, target=timed_rotating_handler
+    )
+    _BATCH_HANDLERS.append(batching_handler)
+
+    if _flusher is None:
+        _start_flusher()
+
+    queue_handler = logging.handlers.QueueHandler(queue.Queue(-1))
+    _LISTENERS.append((queue_handler, _start_listener(queue_handler, batching_handler)))
+
+    logger.addHandler(queue_handler)
 
     return logger
@@ -0,0 +1,32 @@
+import logging
+import time
+
+from .logger import get_logger
+
+request_logger = get_logger(logger_name='request', log_level=logging.INFO)
+
+
+def log_transaction(request_id, request, request_epoch, response, view_name=None):
+    '''Method to log a request along with the response sent for it as a single record.
+
+    Args:
+        request_id: id tagging all logs of the request.
+        request: Django's request object.
+        request_epoch: epoch in milliseconds at which request was received.
+        response: Django's response object.
+        view_name: name of the view handling the request (optional).
+
+    '''
+    request_logger.info(
+        '%(request_id)s :: %(method)s %(path)s :: view: %(view_name)s :: status: %(status)s :: '
+        'epoch: %(epoch)s :: duration: %(duration_ms)sms',
+        {
+            'request_id': request_id,
+            'view_name': view_name,
+            'method': request.method,
+            'path': request.path_info,
+            'status': response.status_code,
+            'epoch': request_epoch,
+            'duration_ms': time.time_ns() // 1000000 - request_epoch
+        }
+    )
@@ -0,0 +1,38 @@
+from functools import lru_cache
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import get_urlconf, resolve
+
+
+def resolve_path(path):
+    '''Method to resolve a url path, memoised per path and url conf as url conf does not change at runtime.
+
+    Args:
+        path: url path to resolve, usually request.path_info.
+
+    Returns:
+        Django's ResolverMatch instance, shared between calls so it must not be modified.
+        Copy its kwargs before handing them out.
+
+    Raises:
+        Resolver404: If path does not match any url pattern.
+
+    '''
+
+    # url conf set for current request (request.urlconf) or None for ROOT_URLCONF
+    return _resolve_cached(path, get_urlconf())
+
+
+@lru_cache(maxsize=4096)
+def _resolve_cached(path, urlconf):
+    return resolve(path, urlconf)
+
+
+@receiver(setting_changed)
+def clear_resolve_cache(setting, **kwargs):
+    '''Drop resolved paths when url conf gets swapped, e.g. by override_settings.
+    '''
+
+    if setting == 'ROOT_URLCONF':
+        _resolve_cached.cache_clear()
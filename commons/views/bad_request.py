@@ -1,34 +1,35 @@
+import logging
 import time
-from uuid import uuid4
-
-from django.urls import resolve
 
 from commons.utils.http_error import BadRequest
-from commons.utils.loggers import log_request, log_response
+from commons.utils.loggers import log_transaction, request_logger
+from commons.utils.request_id import generate_request_id
+from commons.utils.url_resolver import resolve_path
 
 
 def http_bad_request_view(request, *args, **kwargs):
     '''View handler for http 400 bad request
     '''
+    # skip building log details when request logs would be dropped anyway
+    if not request_logger.isEnabledFor(logging.INFO):
+        return BadRequest.default_response()
 
-    request_id = str(uuid4())
-    request_epoch = time.time()*1000
+    request_id = generate_request_id()
+    request_epoch = time.time_ns() // 1000000
 
-    request_parameters = resolve(request.path_info)
+    request_parameters = resolve_path(request.path_info)
     request.url_info = {
-        'kwargs': request_parameters.kwargs,
+        'kwargs': dict(request_parameters.kwargs),
         'url_name': request_parameters.url_name,
-        'app_names': request_parameters.app_names,
+        'app_names': list(request_parameters.app_names),
         'app_name': request_parameters.app_name,
-        'namespaces': request_parameters.namespaces,
+        'namespaces': list(request_parameters.namespaces),
         'namespace': request_parameters.namespace,
         'view_name': request_parameters.view_name
     }
 
-    log_request(request_id, request, request_epoch, request_parameters.view_name)
-
-    response = BadRequest().response
+    response = BadRequest.default_response()
 
-    log_response(request_id, request, request_epoch, response)
+    log_transaction(request_id, request, request_epoch, response, request_parameters.view_name)
 
     return response
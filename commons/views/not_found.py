@@ -1,22 +1,25 @@
+import logging
 import time
-from uuid import uuid4
 
 from django.urls import resolve
 
 from commons.utils.http_error import NotFound
-from commons.utils.loggers import log_request, log_response
+from commons.utils.loggers import log_transaction, request_logger
+from commons.utils.request_id import generate_request_id
 
 
 def http_not_found_view(request, *args, **kwargs):
     '''View handler for http 404 not found
     '''
-    request_id = str(uuid4())
-    request_epoch = time.time()*1000
+    # skip building log details when request logs would be dropped anyway
+    if not request_logger.isEnabledFor(logging.INFO):
+        return NotFound.default_response()
 
-    log_request(request_id, request, request_epoch)
+    request_id = generate_request_id()
+    request_epoch = time.time_ns() // 1000000
 
-    response = NotFound().response
+    response = NotFound.default_response()
 
-    log_response(request_id, request, request_epoch, response)
+    log_transaction(request_id, request, request_epoch, response)
 
     return response